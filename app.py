@@ -1,7 +1,9 @@
 import os
 import sys
 import sqlite3
+import hashlib
 import secrets
+import shutil
 import mimetypes
 import asyncio
 import logging
@@ -22,7 +24,7 @@ except Exception:  # pragma: no cover
 
 
 from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse, HTMLResponse
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 
@@ -39,6 +41,8 @@ BASE_URL = os.getenv("BASE_URL", "") # z.B. "https://files.dein-domain.tld"
 DEFAULT_EXPIRE_DAYS = int(os.getenv("DEFAULT_EXPIRE_DAYS", "2"))
 MAX_EXPIRE_DAYS = int(os.getenv("MAX_EXPIRE_DAYS", "30"))
 CLEANUP_INTERVAL_HOURS = int(os.getenv("CLEANUP_INTERVAL_HOURS", "1"))  # Cleanup alle X Stunden
+# Lese-Blockgröße beim Ausliefern lokaler Dateien (Starlette-Default: 64 KiB)
+DOWNLOAD_CHUNK_BYTES = int(os.getenv("DOWNLOAD_CHUNK_BYTES", str(1024 * 1024)))
 
 # IP-Zugriffskontrolle Konfiguration
 INTERNAL_NETWORKS = os.getenv("INTERNAL_NETWORKS", "192.168.0.0/16,10.0.0.0/8,172.16.0.0/12,127.0.0.1/32").split(",")
@@ -130,6 +134,28 @@ def ensure_bucket():
 def s3_object_key(file_id: str, suffix: str) -> str:
     return f"dateilink/{file_id}{suffix}"  # Namespace
 
+def copy_s3_object(src_key: str, dst_key: str):
+    # Serverseitige Kopie (managed transfer, auch > 5 GB); keine Daten über den Client
+    client = get_s3_client()
+    client.copy({"Bucket": S3_BUCKET, "Key": src_key}, S3_BUCKET, dst_key)
+
+class HashingReader:
+    """Read-only Wrapper: zählt Bytes und berechnet SHA-256, während boto3 liest.
+    Absichtlich ohne seek/tell: boto3 liest ein nicht-seekbares Objekt streng sequentiell,
+    bei seekbaren Quellen würden Multipart-Teile parallel und ungeordnet gelesen.
+    """
+    def __init__(self, f):
+        self._f = f
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def read(self, n: int = -1) -> bytes:
+        chunk = self._f.read(n)
+        self.size += len(chunk)
+        self.hasher.update(chunk)
+        return chunk
+
+
 def upload_stream_to_s3(file_like, key: str, content_type: str):
     client = get_s3_client()
     client.upload_fileobj(file_like, S3_BUCKET, key, ExtraArgs={"ContentType": content_type})
@@ -327,6 +353,13 @@ with get_db() as conn:
         conn.commit()
     except sqlite3.OperationalError:
         pass
+    # Migration: sha256 Spalte (Inhalts-Hash für Deduplizierung)
+    try:
+        conn.execute("ALTER TABLE files ADD COLUMN sha256 TEXT")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sha256 ON files(sha256);")
     conn.commit()
 
 
@@ -693,20 +726,22 @@ async def upload(request: Request, file: UploadFile = File(...), expires_in_days
     size = 0
     storage_mode = "local"
     stored_path = None
+    hasher = hashlib.sha256()
 
     if is_s3_backend():
         storage_mode = "s3"
         if not (S3_BUCKET and S3_ACCESS_KEY and S3_SECRET_KEY):
             raise HTTPException(status_code=500, detail="S3 Backend unvollständig konfiguriert.")
-        # Größe bestimmen
-        file.file.seek(0, os.SEEK_END)
-        size = file.file.tell()
+        # Größe und Hash während des Uploads bestimmen (ein einziger Lesedurchlauf)
         file.file.seek(0)
+        reader = HashingReader(file.file)
         key = s3_object_key(file_id, safe_suffix)
         try:
-            upload_stream_to_s3(file.file, key, mime)
+            upload_stream_to_s3(reader, key, mime)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Fehler beim Upload: {e}")
+        size = reader.size
+        hasher = reader.hasher
         stored_path = f"s3://{S3_BUCKET}/{key}"
     else:
         disk_path = STORAGE_DIR / f"{file_id}{safe_suffix}"
@@ -716,11 +751,13 @@ async def upload(request: Request, file: UploadFile = File(...), expires_in_days
                 if not chunk:
                     break
                 size += len(chunk)
+                hasher.update(chunk)
                 f_out.write(chunk)
         stored_path = str(disk_path)
 
     created = utcnow_iso()
     expires_at = compute_expiry(expires_in_days)
+    sha256 = hasher.hexdigest()
     
     # Markiere One-Time-Downloads (wenn expires_in_days = 0)
     one_time_download = 1 if expires_in_days == 0 else 0
@@ -729,10 +766,10 @@ async def upload(request: Request, file: UploadFile = File(...), expires_in_days
         try:
             conn.execute(
                 """
-                INSERT INTO files(id, token, orig_name, mime, size, path, created_at, expires_at, one_time_download, storage)
-                VALUES(?,?,?,?,?,?,?,?,?,?)
+                INSERT INTO files(id, token, orig_name, mime, size, path, created_at, expires_at, one_time_download, storage, sha256)
+                VALUES(?,?,?,?,?,?,?,?,?,?,?)
                 """,
-                (file_id, token, orig_name, mime, size, stored_path, created, expires_at, one_time_download, storage_mode),
+                (file_id, token, orig_name, mime, size, stored_path, created, expires_at, one_time_download, storage_mode, sha256),
             )
             conn.commit()
         except sqlite3.OperationalError:
@@ -741,10 +778,10 @@ async def upload(request: Request, file: UploadFile = File(...), expires_in_days
                 conn.execute("ALTER TABLE files ADD COLUMN storage TEXT DEFAULT 'local'")
                 conn.execute(
                     """
-                    INSERT INTO files(id, token, orig_name, mime, size, path, created_at, expires_at, one_time_download, storage)
-                    VALUES(?,?,?,?,?,?,?,?,?,?)
+                    INSERT INTO files(id, token, orig_name, mime, size, path, created_at, expires_at, one_time_download, storage, sha256)
+                    VALUES(?,?,?,?,?,?,?,?,?,?,?)
                     """,
-                    (file_id, token, orig_name, mime, size, stored_path, created, expires_at, one_time_download, storage_mode),
+                    (file_id, token, orig_name, mime, size, stored_path, created, expires_at, one_time_download, storage_mode, sha256),
                 )
                 conn.commit()
             except Exception as e:
@@ -760,6 +797,7 @@ async def upload(request: Request, file: UploadFile = File(...), expires_in_days
         "expires_at": expires_at,
         "filename": orig_name,
         "size": size,
+        "sha256": sha256,
         }
     )
 
@@ -955,12 +993,15 @@ async def download(token: str, background_tasks: BackgroundTasks, request: Reque
                     conn_ud.commit()
             except Exception:
                 pass
-            return FileResponse(
+            response = FileResponse(
                 path,
                 media_type=row["mime"] or "application/octet-stream",
                 filename=row["orig_name"],
                 headers=headers,
             )
+            # Größere Blöcke = weniger read/send-Runden pro Download
+            response.chunk_size = DOWNLOAD_CHUNK_BYTES
+            return response
         
         
     except Exception as e:
@@ -1131,16 +1172,57 @@ async def get_system_info(request: Request):
     }
 
 
+@app.api_route("/health", methods=["GET", "HEAD"])
+async def health():
+    """Leichter Erreichbarkeits-Check (z.B. für Statusanzeigen): kein Body, keine DB-Abfrage"""
+    return Response(status_code=204)
+
+
 @app.get("/api/access-info")
 async def access_info(request: Request):
     """Gibt Zugriffsinformationen für die aktuelle IP zurück"""
     return get_access_info(request)
 
 
+def link_status_from_row(row) -> dict:
+    """Status-Antwort für einen files-Eintrag (row darf None sein)."""
+    if not row:
+        return {"exists": False, "downloaded": False}
+    # Prüfe Ablauf
+    exp = row["expires_at"]
+    if exp:
+        try:
+            if datetime.fromisoformat(exp) < datetime.now(timezone.utc):
+                return {"exists": False, "downloaded": False}
+        except ValueError:
+            return {"exists": False, "downloaded": False}
+    downloaded = False
+    download_count = 0
+    try:
+        downloaded = bool(row["downloaded"])
+    except Exception:
+        downloaded = False
+    try:
+        download_count = int(row["download_count"]) if row["download_count"] is not None else 0
+    except Exception:
+        download_count = 0
+    # Rückwärtskompatibel: downloaded bleibt erhalten, zusätzlich Zähler liefern
+    return {"exists": True, "downloaded": downloaded, "download_count": download_count}
+
+
+def json_with_etag(request: Request, payload: dict) -> Response:
+    """JSON-Antwort mit ETag; stimmt If-None-Match überein, nur 304 ohne Body."""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.get("/api/link-status/{token}")
-async def link_status(token: str):
+async def link_status(token: str, request: Request):
     """Leichtgewichtige Prüfung, ob ein Download-Link (Token) noch existiert.
-    Keine Nebenwirkungen, kein Datei-Streaming.
+    Keine Nebenwirkungen, kein Datei-Streaming. Unterstützt If-None-Match (304 bei unverändertem Status).
     """
     try:
         with get_db() as conn:
@@ -1148,32 +1230,149 @@ async def link_status(token: str):
                 "SELECT expires_at, downloaded, download_count FROM files WHERE token = ?",
                 (token,)
             ).fetchone()
-        if not row:
-            return {"exists": False, "downloaded": False}
-        # Prüfe Ablauf
-        exp = row["expires_at"]
-        if exp:
-            try:
-                if datetime.fromisoformat(exp) < datetime.now(timezone.utc):
-                    return {"exists": False, "downloaded": False}
-            except ValueError:
-                return {"exists": False, "downloaded": False}
-        downloaded = False
-        download_count = 0
-        try:
-            downloaded = bool(row["downloaded"])
-        except Exception:
-            downloaded = False
-        try:
-            download_count = int(row["download_count"]) if row["download_count"] is not None else 0
-        except Exception:
-            download_count = 0
-        # Rückwärtskompatibel: downloaded bleibt erhalten, zusätzlich Zähler liefern
-        return {"exists": True, "downloaded": downloaded, "download_count": download_count}
+        return json_with_etag(request, link_status_from_row(row))
     except Exception:
         # Bei Fehler konservativ: nicht löschen im Frontend
         return {"exists": True, "downloaded": False, "download_count": 0}
 
+
+# Maximale Anzahl Platzhalter pro IN-Abfrage (SQLite-Limit älterer Versionen: 999)
+LINK_STATUS_BATCH_SIZE = 500
+
+
+@app.post("/api/link-status")
+async def link_status_batch(request: Request):
+    """Status für viele Tokens in einem Aufruf: {"tokens": [...]} -> {"statuses": {token: {...}}}.
+    Gleiche Semantik wie GET /api/link-status/{token}, aber nur ein Round-Trip für die ganze Liste.
+    Unterstützt ebenfalls If-None-Match für dieselbe Token-Liste.
+    """
+    try:
+        payload = await request.json()
+        tokens = payload.get("tokens")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Ungültige JSON-Daten")
+    if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+        raise HTTPException(status_code=400, detail="'tokens' muss eine Liste von Strings sein")
+    tokens = list(dict.fromkeys(tokens))
+    try:
+        rows = {}
+        with get_db() as conn:
+            for i in range(0, len(tokens), LINK_STATUS_BATCH_SIZE):
+                chunk = tokens[i:i + LINK_STATUS_BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(
+                    f"SELECT token, expires_at, downloaded, download_count FROM files WHERE token IN ({placeholders})",
+                    chunk,
+                ):
+                    rows[row["token"]] = row
+        return json_with_etag(request, {"statuses": {t: link_status_from_row(rows.get(t)) for t in tokens}})
+    except Exception:
+        # Bei Fehler konservativ: nicht löschen im Frontend
+        return {"statuses": {t: {"exists": True, "downloaded": False, "download_count": 0} for t in tokens}}
+
+@app.post("/api/upload-by-hash")
+async def upload_by_hash(
+    request: Request,
+    sha256: str = Form(...),
+    filename: str = Form(...),
+    expires_in_days: int = Form(DEFAULT_EXPIRE_DAYS),
+):
+    """Upload ohne erneute Übertragung, wenn der Inhalt (SHA-256) bereits gespeichert ist.
+    Legt einen eigenen Eintrag mit neuem Token, dem übergebenen Dateinamen und der gewünschten
+    Ablaufzeit an; die Daten werden serverseitig verknüpft (Hardlink) bzw. kopiert, sodass jeder
+    Eintrag seine eigene Datei besitzt und unabhängig gelöscht werden kann.
+    Antwort wie /api/upload, oder {"ok": false, "exists": false} -> normal hochladen.
+    One-Time-Downloads werden so nie angelegt; abgelaufene (noch nicht bereinigte) und
+    One-Time-Einträge dienen nie als Quelle.
+    Achtung: Wer hochladen darf, erhält allein mit dem SHA-256 einen Link auf jeden passenden
+    Inhalt, auch den anderer Benutzer, und erfährt, ob dieser Inhalt gespeichert ist. Eine
+    Zuordnung zu einzelnen Benutzern gibt es nicht (gemeinsamer Upload-Token bzw. interne IP),
+    der Endpoint ist daher nur für vertrauenswürdige Uploader gedacht.
+    """
+    if not check_upload_permission(request):
+        raise HTTPException(status_code=403, detail="Upload nur für interne Benutzer erlaubt.")
+    digest = sha256.strip().lower()
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise HTTPException(status_code=400, detail="Ungültiger SHA-256")
+    expires_in_days = min(expires_in_days, MAX_EXPIRE_DAYS)
+    if expires_in_days <= 0:
+        return {"ok": False, "exists": False}
+
+    with get_db() as conn:
+        rows = conn.execute(
+            """
+            SELECT size, path, storage FROM files
+            WHERE sha256 = ? AND one_time_download = 0
+              AND (expires_at IS NULL OR expires_at > ?)
+            ORDER BY created_at DESC
+            """,
+            (digest, utcnow_iso())
+        ).fetchall()
+
+    file_id = secrets.token_hex(16)
+    token = secrets.token_urlsafe(32)
+    orig_name = filename or "upload.bin"
+    mime = mimetypes.guess_type(orig_name)[0] or "application/octet-stream"
+    safe_suffix = Path(orig_name).suffix
+    stored_path = None
+    storage_mode = "local"
+    size = 0
+    for row in rows:
+        try:
+            if (row["storage"] or "local") == "s3":
+                p = row["path"]
+                src_key = p[len("s3://"):].split("/", 1)[1] if p.startswith("s3://") else p
+                key = s3_object_key(file_id, safe_suffix)
+                copy_s3_object(src_key, key)
+                stored_path = f"s3://{S3_BUCKET}/{key}"
+                storage_mode = "s3"
+            else:
+                src = Path(row["path"])
+                disk_path = STORAGE_DIR / f"{file_id}{safe_suffix}"
+                try:
+                    # Hardlink: kein zusätzlicher Speicher, Löschen eines Eintrags lässt den anderen intakt
+                    os.link(src, disk_path)
+                except OSError as e:
+                    if not src.exists():
+                        raise
+                    logger.info(f"Hardlink nicht möglich ({e}), kopiere serverseitig")
+                    try:
+                        shutil.copyfile(src, disk_path)
+                    except Exception:
+                        disk_path.unlink(missing_ok=True)
+                        raise
+                stored_path = str(disk_path)
+            size = row["size"]
+            break
+        except Exception as e:
+            # Quelle inzwischen gelöscht/nicht lesbar -> nächsten Kandidaten probieren
+            logger.debug(f"Dedup-Quelle nicht nutzbar: {e}")
+            continue
+    if stored_path is None:
+        return {"ok": False, "exists": False}
+
+    created = utcnow_iso()
+    expires_at = compute_expiry(expires_in_days)
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT INTO files(id, token, orig_name, mime, size, path, created_at, expires_at, one_time_download, storage, sha256)
+            VALUES(?,?,?,?,?,?,?,?,?,?,?)
+            """,
+            (file_id, token, orig_name, mime, size, stored_path, created, expires_at, 0, storage_mode, digest),
+        )
+        conn.commit()
+
+    return {
+        "ok": True,
+        "download_url": public_download_url(token, request),
+        "token": token,
+        "expires_at": expires_at,
+        "filename": orig_name,
+        "size": size,
+        "sha256": digest,
+    }
+
 @app.get("/admin/api/debug-files")
 async def debug_files(request: Request):
     """Debug-Endpoint um alle Dateien in der Datenbank zu sehen"""
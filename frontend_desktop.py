@@ -1,119 +1,443 @@
 import os
+import stat
 import sys
 import json
+import hashlib
+import heapq
+import itertools
+import mimetypes
+import queue
 import threading
 import time
+import traceback
 import webbrowser
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import urlsplit
 from datetime import datetime, timezone
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import tkinter.font as tkfont
 
-import requests
 try:
-    from PIL import Image, ImageTk  # type: ignore
-    _HAS_PIL = True
+    import ijson  # type: ignore
+    _HAS_IJSON = True
 except Exception:
-    Image = None  # type: ignore
-    ImageTk = None  # type: ignore
-    _HAS_PIL = False
+    ijson = None  # type: ignore
+    _HAS_IJSON = False
 
+try:
+    # C-Parser für ISO-8601, versteht auch das 'Z'-Suffix
+    from ciso8601 import parse_datetime as _ciso_parse  # type: ignore
+except Exception:
+    _ciso_parse = None
 
-    class Tooltip:
-        """Simple tooltip for a widget.
-        Usage: Tooltip(widget, "your text")
-        """
-        def __init__(self, widget, text: str, delay: int = 500):
-            self.widget = widget
-            self.text = text
-            self.delay = delay
-            self._id = None
-            self._tip = None
-            widget.bind("<Enter>", self._on_enter, add="+")
-            widget.bind("<Leave>", self._on_leave, add="+")
-            widget.bind("<Motion>", self._on_motion, add="+")
+try:
+    import orjson  # type: ignore
+    _HAS_ORJSON = True
+except Exception:
+    orjson = None  # type: ignore
+    _HAS_ORJSON = False
 
-        def _on_enter(self, _evt=None):
-            self._schedule()
+# Ab dieser Größe wird history.json gestreamt statt komplett eingelesen (auch mit orjson)
+HISTORY_STREAM_THRESHOLD = 256 * 1024
 
-        def _on_motion(self, _evt=None):
-            # restart timer on move for a smoother feel
-            self._schedule()
 
-        def _on_leave(self, _evt=None):
-            self._cancel()
-            self._hide()
+def _json_loads(data: bytes):
+    """Parse JSON bytes; uses orjson when installed, stdlib json otherwise."""
+    if _HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8-sig"))
 
-        def _schedule(self):
-            self._cancel()
-            self._id = self.widget.after(self.delay, self._show)
 
-        def _cancel(self):
-            if self._id is not None:
-                try:
-                    self.widget.after_cancel(self._id)
-                except Exception:
-                    pass
-                self._id = None
+def _json_dumps(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes; uses orjson when installed."""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+# requests (inkl. urllib3/idna/certifi) und PIL werden erst bei Bedarf importiert,
+# damit das Fenster schneller erscheint.
+
+
+@lru_cache(maxsize=1)
+def _load_pil():
+    """Import PIL on first use; returns (Image, ImageTk) or None if Pillow is missing."""
+    try:
+        from PIL import Image, ImageTk  # type: ignore
+    except Exception:
+        return None
+    return Image, ImageTk
+
 
-        def _show(self):
-            if self._tip is not None:
+class _DaemonPool:
+    """Small thread pool made of daemon threads fed by a queue.
+    Unlike ThreadPoolExecutor its workers are not joined at interpreter exit, so a
+    check hanging on an unreachable backend cannot keep the process alive.
+    All `max_workers` threads are started on the first submit.
+    """
+    def __init__(self, max_workers: int, name: str):
+        self._max = max(1, max_workers)
+        self._name = name
+        self._tasks: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("pool is shut down")
+            if not self._threads:
+                for i in range(self._max):
+                    t = threading.Thread(target=self._work, daemon=True, name=f"{self._name}-{i}")
+                    self._threads.append(t)
+                    t.start()
+            self._tasks.put((fn, args))
+
+    def map(self, fn, items: list) -> list:
+        """fn auf alle Elemente anwenden (parallel); Ergebnisse in Eingabereihenfolge.
+        Eine Ausnahme aus fn wird an den Aufrufer weitergegeben.
+        """
+        done: queue.Queue = queue.Queue()
+
+        def run(i, item):
+            try:
+                done.put((i, fn(item), None))
+            except BaseException as e:
+                done.put((i, None, e))
+
+        for i, item in enumerate(items):
+            self.submit(run, i, item)
+        results = [None] * len(items)
+        for _ in items:
+            i, res, err = done.get()
+            if err is not None:
+                raise err
+            results[i] = res
+        return results
+
+    def shutdown(self):
+        # Ausstehende Aufgaben verwerfen, laufende Threads nicht abwarten
+        with self._lock:
+            self._closed = True
+            try:
+                while True:
+                    self._tasks.get_nowait()
+            except queue.Empty:
+                pass
+            for _ in self._threads:
+                self._tasks.put(None)
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
                 return
+            fn, args = task
             try:
-                x = self.widget.winfo_rootx() + 20
-                y = self.widget.winfo_rooty() + self.widget.winfo_height() + 6
-                self._tip = tk.Toplevel(self.widget)
-                self._tip.wm_overrideredirect(True)
-                self._tip.wm_geometry(f"+{x}+{y}")
-                lbl = tk.Label(
-                    self._tip,
-                    text=self.text,
-                    background="#111827",
-                    foreground="#e5e7eb",
-                    padx=6,
-                    pady=3,
-                    relief=tk.SOLID,
-                    borderwidth=1,
-                )
-                lbl.pack()
+                fn(*args)
             except Exception:
-                # Fail silently if tooltip cannot be created
-                self._tip = None
+                # Worker am Leben lassen, den Fehler aber nicht verschlucken (pythonw: kein stderr)
+                if sys.stderr is not None:
+                    traceback.print_exc()
 
-        def _hide(self):
-            if self._tip is not None:
-                try:
-                    self._tip.destroy()
-                except Exception:
-                    pass
-                self._tip = None
+
+class Tooltip:
+    """Simple tooltip for a widget.
+    Usage: Tooltip(widget, "your text")
+    Shows after the pointer has rested for `delay` ms; mouse motion only records a
+    timestamp, a single pending `after` poll decides when to show.
+    """
+    def __init__(self, widget, text: str, delay: int = 500):
+        self.widget = widget
+        self.text = text
+        self.delay = delay
+        self._id = None
+        self._tip = None
+        self._inside = False
+        self._last_move_ts = 0.0
+        widget.bind("<Enter>", self._on_enter, add="+")
+        widget.bind("<Leave>", self._on_leave, add="+")
+        widget.bind("<Motion>", self._on_motion, add="+")
+
+    def _on_enter(self, _evt=None):
+        self._inside = True
+        self._last_move_ts = time.perf_counter()
+        if self._id is None:
+            self._id = self.widget.after(self.delay, self._poll)
+
+    def _on_motion(self, _evt=None):
+        # Kein after_cancel/after pro Pixel: nur Zeitstempel merken
+        self._last_move_ts = time.perf_counter()
+
+    def _on_leave(self, _evt=None):
+        self._inside = False
+        self._cancel()
+        self._hide()
+
+    def _poll(self):
+        self._id = None
+        if not self._inside:
+            return
+        remaining = self.delay / 1000 - (time.perf_counter() - self._last_move_ts)
+        if remaining <= 0:
+            self._show()
+        else:
+            self._id = self.widget.after(max(1, int(remaining * 1000)), self._poll)
+
+    def _cancel(self):
+        if self._id is not None:
+            try:
+                self.widget.after_cancel(self._id)
+            except Exception:
+                pass
+            self._id = None
+
+    def _show(self):
+        if self._tip is not None:
+            return
+        try:
+            x = self.widget.winfo_rootx() + 20
+            y = self.widget.winfo_rooty() + self.widget.winfo_height() + 6
+            self._tip = tk.Toplevel(self.widget)
+            self._tip.wm_overrideredirect(True)
+            self._tip.wm_geometry(f"+{x}+{y}")
+            lbl = tk.Label(
+                self._tip,
+                text=self.text,
+                background="#111827",
+                foreground="#e5e7eb",
+                padx=6,
+                pady=3,
+                relief=tk.SOLID,
+                borderwidth=1,
+            )
+            lbl.pack()
+        except Exception:
+            # Fail silently if tooltip cannot be created
+            self._tip = None
+
+    def _hide(self):
+        if self._tip is not None:
+            try:
+                self._tip.destroy()
+            except Exception:
+                pass
+            self._tip = None
+
+
+_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+# Lesepuffer für Uploads; größer = weniger read()-Syscalls pro Datei
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Parallele Link-Prüfungen in _check_links
+PRUNE_WORKERS = 8
+DEFAULT_API_URL = "http://127.0.0.1:8000"
+# Intervall der automatischen Link-Prüfung; verdoppelt sich bei unveränderten Durchläufen bis zur Obergrenze
+VALIDATE_INTERVAL_MS = 600 * 1000
+VALIDATE_INTERVAL_MAX_MS = 3600 * 1000
 
 
 def human_bytes(num: int) -> str:
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if num < 1024.0:
-            return f"{num:3.1f} {unit}"
-        num /= 1024.0
-    return f"{num:.1f} PB"
+    num = int(num)
+    if num < 1024:
+        return f"{num} B"
+    # Einheit direkt aus der Bitlänge bestimmen (je 10 Bit = Faktor 1024)
+    idx = min((num.bit_length() - 1) // 10, len(_UNITS) - 1)
+    return f"{num / (1 << (idx * 10)):.1f} {_UNITS[idx]}"
+
+
+class HashingFile:
+    """Datei-Wrapper: berechnet SHA-256 und Größe, während der Upload die Bytes liest (ein Durchlauf).
+    Mit hash=False wird nur gezählt (Digest ist bereits bekannt).
+    """
+
+    def __init__(self, f, hash: bool = True):
+        self._f = f
+        self.hasher = hashlib.sha256() if hash else None
+        self.nbytes = 0
+
+    def read(self, n: int = -1) -> bytes:
+        chunk = self._f.read(n)
+        if chunk:
+            if self.hasher is not None:
+                self.hasher.update(chunk)
+            self.nbytes += len(chunk)
+        return chunk
 
+    def __getattr__(self, name):
+        # fileno/seek/tell usw. an die echte Datei weiterreichen (Längenbestimmung des Encoders)
+        return getattr(self._f, name)
 
-def upload_file(api_base: str, file_path: Path, expires: int, token: str | None = None) -> dict:
+
+def upload_file(
+    api_base: str, file_path: Path, expires: int, token: str | None = None, session=None, progress=None,
+    digest: str | None = None,
+) -> dict:
     """Upload Datei zum Backend.
     Wenn token gesetzt -> Header 'X-DateiLink-Token' mitsenden.
+    Optional eine requests.Session übergeben, um deren Verbindung wiederzuverwenden.
+    progress(bytes_sent, total) wird während des Uploads aufgerufen (aus dem Upload-Thread).
+    Mit requests-toolbelt wird der Body gestreamt statt komplett im Speicher aufgebaut.
+    SHA-256 und Größe werden beim Senden mitgerechnet und mit der Antwort des Backends abgeglichen
+    (Abweichung -> 'verify_error' in der Antwort, der Link bleibt gültig);
+    ist digest bereits bekannt, wird die Datei nicht ein zweites Mal gehasht.
     """
+    import requests
+    try:
+        from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor  # type: ignore
+    except ImportError:
+        MultipartEncoder = MultipartEncoderMonitor = None  # type: ignore
+
+    http = session or requests
     url = api_base.rstrip("/") + "/api/upload"
     headers = {}
     if token:
         headers["X-DateiLink-Token"] = token.strip()
-    with open(file_path, "rb") as f:
-        files = {"file": (file_path.name, f)}
-        data = {"expires_in_days": str(expires)}
-        resp = requests.post(url, files=files, data=data, headers=headers, timeout=300)
+    with open(file_path, "rb", buffering=UPLOAD_CHUNK_BYTES) as raw:
+        f = HashingFile(raw, hash=digest is None)
+        if MultipartEncoder is not None:
+            mime = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+            body = MultipartEncoder(fields={
+                "expires_in_days": str(expires),
+                "file": (file_path.name, f, mime),
+            })
+            if progress is not None:
+                body = MultipartEncoderMonitor(body, lambda m: progress(m.bytes_read, m.len))
+            headers["Content-Type"] = body.content_type
+            resp = http.post(url, data=body, headers=headers, timeout=300)
+        else:
+            # Fallback ohne requests-toolbelt: requests baut den Multipart-Body im Speicher
+            files = {"file": (file_path.name, f)}
+            data = {"expires_in_days": str(expires)}
+            resp = http.post(url, files=files, data=data, headers=headers, timeout=300)
         resp.raise_for_status()
-        return resp.json()
+    data = resp.json()
+    if digest is None:
+        digest = f.hasher.hexdigest()
+    # Abweichung nur melden: die Datei liegt bereits auf dem Server, der Link soll nicht verloren gehen
+    remote = data.get("sha256")
+    if remote and remote != digest:
+        data["verify_error"] = f"Prüfsumme stimmt nicht überein (lokal {digest}, Server {remote})"
+    elif data.get("size") is not None and data.get("size") != f.nbytes:
+        data["verify_error"] = f"Größe stimmt nicht überein (gesendet {f.nbytes}, Server {data.get('size')})"
+    data.setdefault("sha256", digest)
+    return data
+
+
+def file_sha256(file_path: Path) -> str:
+    """SHA-256 einer Datei (hashlib.file_digest nutzt die OpenSSL-Schleife ab Python 3.11)."""
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def upload_by_hash(
+    api_base: str, digest: str, filename: str, expires: int, token: str | None = None, session=None
+) -> dict | None:
+    """Neuer Link für bereits auf dem Backend gespeicherten Inhalt (per SHA-256), ohne erneute Übertragung.
+    Das Backend legt einen eigenen Eintrag mit diesem Dateinamen und dieser Laufzeit an.
+    Gibt die Upload-Antwort zurück oder None (Inhalt unbekannt oder älteres Backend ohne Endpoint).
+    """
+    import requests
+
+    http = session or requests
+    url = api_base.rstrip("/") + "/api/upload-by-hash"
+    headers = {}
+    if token:
+        headers["X-DateiLink-Token"] = token.strip()
+    try:
+        resp = http.post(
+            url,
+            data={"sha256": digest, "filename": filename, "expires_in_days": str(expires)},
+            headers=headers,
+            timeout=30,
+        )
+        if resp.ok:
+            data = resp.json()
+            if data.get("ok") and data.get("download_url"):
+                return data
+    except (requests.RequestException, ValueError):
+        pass
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime | None:
+    """Parse an ISO-8601 timestamp once per distinct string (UTC-aware, None if invalid).
+    Used for expires_at and created_at; ciso8601 when installed, stdlib otherwise.
+    """
+    try:
+        ts = value.strip()
+        if _ciso_parse is not None:
+            dt = _ciso_parse(ts)
+        else:
+            # Support timestamps with trailing 'Z' and without timezone
+            if ts.endswith("Z"):
+                ts = ts[:-1] + "+00:00"
+            dt = datetime.fromisoformat(ts)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+    except Exception:
+        return None
+
+
+def _download_count(it: dict) -> int:
+    """Download-Zähler als int; Alt-Historie kennt nur das bool 'downloaded'."""
+    count = it.get("download_count")
+    if isinstance(count, bool):
+        count = 1 if count else 0
+    if count is None:
+        count = 1 if it.get("downloaded") else 0
+    try:
+        return int(count)
+    except Exception:
+        return 0
+
+
+def _created_ts(it: dict) -> float:
+    """created_at als Unix-Zeit, einmal geparst und unter '_created_ts' am Eintrag gecacht."""
+    ts = it.get("_created_ts")
+    if ts is None:
+        created = it.get("created_at")
+        dt = _parse_iso(created) if isinstance(created, str) else None
+        ts = dt.timestamp() if dt else float("-inf")
+        it["_created_ts"] = ts
+    return ts
+
+
+def _api_base_from(url: str | None) -> tuple[str, bool]:
+    """API-URL einmal normalisieren (ohne abschließenden '/') und prüfen.
+    Rückgabe: (Basis-URL, gültig) – gültig heißt http(s) mit Host.
+    """
+    base = (url or DEFAULT_API_URL).strip().rstrip("/")
+    try:
+        parts = urlsplit(base)
+        valid = parts.scheme in ("http", "https") and bool(parts.netloc)
+    except ValueError:
+        valid = False
+    return base, valid
+
+
+def _persistable(items: list) -> list:
+    """Strip runtime-only keys (prefixed with '_') before writing history to disk."""
+    return [{k: v for k, v in it.items() if not k.startswith("_")} for it in items]
 
 
+def _history_key(it: dict) -> str:
+    """Eindeutiger Schlüssel eines Historien-Eintrags: Token, sonst Download-URL."""
+    return it.get("token") or it.get("download_url") or f"@{id(it)}"
+
+
+@lru_cache(maxsize=1)
 def _app_dir() -> Path:
     """Return directory for config/history: next to .exe when frozen, else script dir."""
     if getattr(sys, "frozen", False):  # PyInstaller onefile
@@ -121,6 +445,7 @@ def _app_dir() -> Path:
     return Path(__file__).parent
 
 
+@lru_cache(maxsize=1)
 def _res_dir() -> Path:
     """Return directory for bundled resources (PyInstaller _MEIPASS) or script dir.
     Use this for read-only assets like images/icons that are packaged into the exe.
@@ -132,6 +457,13 @@ def _res_dir() -> Path:
     return Path(__file__).parent
 
 
+# Gebündelte Assets einmal beim Import auflösen
+ICON_PATH = _res_dir() / "static" / "dateilink.ico"
+LOGO_PATH = _res_dir() / "static" / "logo.png"
+# Kantenlänge des Icons in der Kopfzeile
+HEADER_ICON_PX = 20
+
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -139,13 +471,15 @@ class App(tk.Tk):
         self.geometry("820x560")
 
         # Modernes Icon setzen (bevorzugt aus gebündelten Ressourcen ./static)
-        icon_path = _res_dir() / "static" / "dateilink.ico"
+        icon_path = ICON_PATH
         if icon_path.exists():
             try:
                 self.iconbitmap(str(icon_path))
             except Exception:
                 # Fallback: try iconphoto via PIL if available
-                if _HAS_PIL:
+                pil = _load_pil()
+                if pil:
+                    Image, ImageTk = pil
                     try:
                         _img = Image.open(icon_path)
                         self._app_icon = ImageTk.PhotoImage(_img)
@@ -157,11 +491,29 @@ class App(tk.Tk):
         self._setup_style()
 
         self.selected_file = None
+        # Größe/mtime aus dem stat in choose_file, damit Upload nicht erneut stat'en muss
+        self.selected_file_stat = None
+        # (Pfad, Größe, mtime_ns) -> SHA-256, damit erneutes Hochladen derselben Datei nicht neu hasht
+        self._digest_cache: dict[tuple, str] = {}
         self.last_link = None
+        # Widget-Updates aus Worker-Threads laufen über diese Queue in den Tk-Hauptthread
+        self._ui_queue = queue.Queue()
+        # Threaded Tcl (Standard): Worker wecken den Hauptthread per virtuellem Event,
+        # sonst bleibt nur das Abfragen per Timer
+        self._ui_event_driven = self._tcl_threaded()
+        self._ui_wake_lock = threading.Lock()
+        self._ui_wake_pending = False
+        # Gemeinsame HTTP-Session (Keep-Alive) für Upload und Validierung, lazy erzeugt
+        self._session = None
+        self._session_lock = threading.Lock()
         base_dir = _app_dir()
         # Use new filenames; migrate legacy ones if they exist
         self.config_path = base_dir / "config.json"
         self.history_path = base_dir / "history.json"
+        # Entprellte Speicherung: after-ID des geplanten Schreibvorgangs und Hash des zuletzt geschriebenen Inhalts
+        self._history_dirty = False
+        self._history_save_after_id = None
+        self._history_hash: bytes | None = None
         try:
             self._migrate_legacy_file(base_dir / "frontend_config.json", self.config_path)
             self._migrate_legacy_file(base_dir / "frontend_history.json", self.history_path)
@@ -169,12 +521,33 @@ class App(tk.Tk):
             # Migration errors are non-fatal; continue with defaults
             pass
         self.settings = self.load_settings()
+        # Normalisierte API-Basis, nur bei Änderung der Einstellungen neu berechnet
+        self._api_base, _valid = _api_base_from(self.settings.get("api_url"))
+        # Wird beim ersten Speichern der Einstellungen erzeugt
+        self._settings_writer = None
+        self._settings_future = None
+        # Historie nach Token/URL geschlüsselt (neueste zuerst); self.history liefert die Liste
+        self._history_by_key: OrderedDict[str, dict] = OrderedDict()
+        # Min-Heap (Ablaufzeit, seq, Schlüssel, Eintrag): nächster Ablauf in O(1), veraltete Einträge werden beim Pop verworfen
+        self._exp_heap: list = []
+        self._exp_seq = itertools.count()
+        self._expiry_after_id = None
         self.history = self.load_history()
         # Mapping: Treeview item id -> URL (URL wird nicht mehr als Spalte angezeigt)
         self.row_url = {}
+        # Treeview item id -> Historien-Schlüssel (für O(1)-Entfernen)
+        self.row_key: dict[str, str] = {}
+        # Für inkrementelles Aktualisieren: Token/URL -> iid und iid -> angezeigte Werte
+        self._iid_by_key: dict[str, str] = {}
+        self._values_by_iid: dict[str, tuple] = {}
+        # URL -> time.monotonic() der letzten erfolgreichen Prüfung
+        self._last_ok: dict[str, float] = {}
 
         self._build_ui()
         self.refresh_uploads_list()
+        self.bind("<<UiQueue>>", self._drain_ui_queue)
+        # Einmal nach Start der Hauptschleife leeren: Wecksignale vor mainloop() können verloren gehen
+        self.after(50, self._drain_ui_queue)
         # Lazy settings tab handle
         self._settings_tab = None
 
@@ -191,21 +564,10 @@ class App(tk.Tk):
         header = tk.Frame(self, bg=header_bg)
         header.pack(fill=tk.X, side=tk.TOP)
         # Icon in header (prefer dateilink.ico; fallback to logo.png)
-        try:
-            ico_path = _res_dir() / "static" / "dateilink.ico"
-            if _HAS_PIL and ico_path.exists():
-                img = Image.open(ico_path)
-                # Resize to a good header size
-                img = img.resize((20, 20), Image.LANCZOS)
-                self._header_icon = ImageTk.PhotoImage(img)
-                tk.Label(header, image=self._header_icon, bg=header_bg).pack(side=tk.LEFT, padx=(12, 8), pady=8)
-            else:
-                logo_path = _res_dir() / "static" / "logo.png"
-                if logo_path.exists():
-                    self._logo_img = tk.PhotoImage(file=str(logo_path))
-                    tk.Label(header, image=self._logo_img, bg=header_bg).pack(side=tk.LEFT, padx=(12, 8), pady=8)
-        except Exception:
-            pass
+        # Platzhalter jetzt, Bild wird im Hintergrund dekodiert und danach eingesetzt
+        self._header_icon_lbl = tk.Label(header, bg=header_bg)
+        self._header_icon_lbl.pack(side=tk.LEFT, padx=(12, 8), pady=8)
+        threading.Thread(target=self._load_header_icon, daemon=True).start()
         tk.Label(header, text="DateiLink", fg="#ffffff", bg=header_bg, font=("Segoe UI", 14, "bold")).pack(side=tk.LEFT, pady=8)
         # Settings button as symbol with tooltip
         self.settings_btn = ttk.Button(header, text="⚙", style="Header.TButton", width=3, command=self.open_settings)
@@ -236,12 +598,15 @@ class App(tk.Tk):
         self.exp_scale = ttk.Scale(
             frm, from_=0, to=30, orient=tk.HORIZONTAL, variable=self.expires, command=self._on_exp_change
         )
+        self._exp_pending = False
         self.exp_scale.grid(row=2, column=1, columnspan=2, sticky="ew", **pad)
         self.exp_value_lbl = ttk.Label(frm, text="2")
         self.exp_value_lbl.grid(row=2, column=3, sticky="e", **pad)
 
         self.upload_btn = ttk.Button(frm, text="⬆️ Hochladen", width=20, style="Accent.TButton", command=self.on_upload, state=tk.DISABLED)
         self.upload_btn.grid(row=3, column=0, sticky="w", **pad)
+        self.upload_progress = ttk.Progressbar(frm, mode="determinate", maximum=100)
+        self.upload_progress.grid(row=3, column=1, columnspan=3, sticky="ew", **pad)
 
         # Meine Uploads Abschnitt
         sep1 = ttk.Separator(frm)
@@ -317,6 +682,44 @@ class App(tk.Tk):
 
     # Hinweis: Einstellungen-Tab wird erst beim Klick auf ⚙ erstellt
 
+    def _load_header_icon(self):
+        # Läuft im Worker-Thread: PIL-Import, Dekodieren und Skalieren blockieren nicht den ersten Paint
+        try:
+            ico_path = ICON_PATH
+            pil = _load_pil()
+            if pil:
+                Image, _ImageTk = pil
+                # Direkt öffnen statt vorher exists() zu prüfen (ein Syscall weniger)
+                try:
+                    img = Image.open(ico_path)
+                except FileNotFoundError:
+                    img = None
+                if img is not None:
+                    # Kleinste eingebettete ICO-Größe >= Zielgröße dekodieren statt immer der größten
+                    sizes = img.info.get("sizes")
+                    if sizes:
+                        fitting = [sz for sz in sizes if sz[0] >= HEADER_ICON_PX]
+                        img.size = min(fitting) if fitting else max(sizes)
+                    # Resize to a good header size
+                    if img.size != (HEADER_ICON_PX, HEADER_ICON_PX):
+                        img = img.resize((HEADER_ICON_PX, HEADER_ICON_PX), Image.LANCZOS)
+                    self._post_ui(self._install_header_icon, img)
+                    return
+            # Fehlt logo.png, schlägt PhotoImage fehl; der Fehler wird in _drain_ui_queue verworfen
+            self._post_ui(self._install_header_logo, LOGO_PATH)
+        except Exception:
+            pass
+
+    def _install_header_icon(self, img):
+        # PhotoImage muss im Tk-Hauptthread erzeugt werden
+        _Image, ImageTk = _load_pil()
+        self._header_icon = ImageTk.PhotoImage(img)
+        self._header_icon_lbl.configure(image=self._header_icon)
+
+    def _install_header_logo(self, logo_path: Path):
+        self._logo_img = tk.PhotoImage(file=str(logo_path))
+        self._header_icon_lbl.configure(image=self._logo_img)
+
     def _setup_style(self):
         # Global fonts using named Tk fonts (safer than option_add with strings)
         try:
@@ -401,7 +804,71 @@ class App(tk.Tk):
             # Ignore migration issues silently in production
             pass
 
+    def _http(self):
+        """Return the shared requests.Session (created on first use)."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                # Pool groß genug für die parallelen Link-Prüfungen (PRUNE_WORKERS)
+                adapter = HTTPAdapter(
+                    pool_connections=16,
+                    pool_maxsize=16,
+                    max_retries=Retry(total=1, backoff_factor=0.1),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _tcl_threaded(self) -> bool:
+        try:
+            return bool(int(self.tk.eval("info exists tcl_platform(threaded)")))
+        except Exception:
+            return False
+
+    def _post_ui(self, fn, *args):
+        """Queue a callable to run on the Tk main thread (safe to call from workers)."""
+        self._ui_queue.put((fn, args))
+        if not self._ui_event_driven:
+            return
+        # Ein Wecksignal pro Schub; weitere Aufrufe landen im selben Leerdurchlauf
+        with self._ui_wake_lock:
+            if self._ui_wake_pending:
+                return
+            self._ui_wake_pending = True
+        try:
+            # Aus Worker-Threads leitet threaded Tcl den Aufruf an den Hauptthread weiter
+            self.event_generate("<<UiQueue>>", when="tail")
+        except (RuntimeError, tk.TclError):
+            # Hauptschleife läuft (noch) nicht oder Fenster bereits zerstört
+            with self._ui_wake_lock:
+                self._ui_wake_pending = False
+
+    def _drain_ui_queue(self, _evt=None):
+        # Alle anstehenden Updates in einem Durchlauf ausführen; das Flag vorher zurücksetzen,
+        # damit ein währenddessen eingereihter Aufruf erneut weckt
+        with self._ui_wake_lock:
+            self._ui_wake_pending = False
+        while True:
+            try:
+                fn, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception:
+                pass
+        if not self._ui_event_driven:
+            self.after(50, self._drain_ui_queue)
+
     def logln(self, msg: str):
+        if threading.current_thread() is not threading.main_thread():
+            self._post_ui(self.logln, msg)
+            return
         self.log.configure(state=tk.NORMAL)
         self.log.insert(tk.END, msg + "\n")
         self.log.see(tk.END)
@@ -409,54 +876,98 @@ class App(tk.Tk):
 
     def choose_file(self):
         fp = filedialog.askopenfilename()
-        if fp and os.path.isfile(fp):
+        # Ein einziger stat-Aufruf liefert Dateityp und Größe
+        try:
+            st = os.stat(fp) if fp else None
+        except OSError:
+            st = None
+        if st is not None and stat.S_ISREG(st.st_mode):
             self.selected_file = Path(fp)
+            self.selected_file_stat = st
             self.file_var.set(fp)
-            size = self.selected_file.stat().st_size
-            self.logln(f"Ausgewählt: {self.selected_file.name} ({human_bytes(size)})")
+            self.logln(f"Ausgewählt: {self.selected_file.name} ({human_bytes(st.st_size)})")
             self.upload_btn.config(state=tk.NORMAL)
         else:
             self.selected_file = None
+            self.selected_file_stat = None
             self.upload_btn.config(state=tk.DISABLED)
 
     def on_upload(self):
         if not self.selected_file:
             messagebox.showwarning("Hinweis", "Bitte eine Datei auswählen.")
             return
-        api = self.settings.get("api_url", "http://127.0.0.1:8000").strip()
+        api = self._api_base
         # Begrenzen auf 0..30 Tage
-        try:
-            expires = int(self.expires.get())
-        except Exception:
-            expires = 7
-        expires = max(0, min(30, expires))
+        expires = max(0, min(30, self._exp_days()))
         self.upload_btn.config(state=tk.DISABLED)
+        self.upload_progress.config(value=0)
         self.logln("Lade hoch…")
 
+        last_pct = -1
+
+        def on_progress(sent: int, total: int):
+            # Monitor feuert pro gelesenem Block; UI nur bei neuem Prozentwert aktualisieren
+            nonlocal last_pct
+            pct = int(sent * 100 / total) if total else 0
+            if pct != last_pct:
+                last_pct = pct
+                self._post_ui(lambda: self.upload_progress.config(value=pct))
+
         def worker():
+            import requests
+
+            # Frisch stat'en (Worker-Thread): die Datei kann seit der Auswahl geändert worden sein,
+            # sonst würde der Hash-Cache einen veralteten Digest liefern
             try:
-                data = upload_file(api, self.selected_file, expires, self.settings.get("upload_token"))
+                st = os.stat(self.selected_file)
+            except OSError:
+                st = self.selected_file_stat
+            digest = None
+            try:
+                data = None
+                # One-Time-Links nie per Hash anlegen; sonst vorhandenen Inhalt auf dem Server nutzen
+                if expires > 0:
+                    cache_key = (str(self.selected_file), st.st_size, st.st_mtime_ns) if st else None
+                    digest = self._digest_cache.get(cache_key) if cache_key else None
+                    if digest is None:
+                        digest = file_sha256(self.selected_file)
+                        if cache_key:
+                            self._digest_cache[cache_key] = digest
+                    data = upload_by_hash(
+                        api, digest, self.selected_file.name, expires,
+                        self.settings.get("upload_token"), session=self._http(),
+                    )
+                    if data:
+                        self.logln("Inhalt bereits auf dem Server – neuer Link ohne erneute Übertragung.")
+                if data is None:
+                    data = upload_file(
+                        api, self.selected_file, expires, self.settings.get("upload_token"),
+                        session=self._http(), progress=on_progress, digest=digest,
+                    )
                 if data.get("ok"):
                     self.last_link = data.get("download_url")
                     self.logln(f"Fertig. Download-Link: {self.last_link}")
+                    if data.get("verify_error"):
+                        # Link trotzdem aufnehmen, damit der Upload sichtbar bleibt und entfernt werden kann
+                        self.logln(f"Warnung: {data['verify_error']} – bitte Datei prüfen bzw. erneut hochladen.")
                     exp = data.get("expires_at")
                     if exp:
                         self.logln(f"Läuft ab am: {exp}")
                     else:
                         self.logln("Kein Ablaufdatum oder One-Time-Download.")
-                    # In lokale Historie aufnehmen
-                    self.add_history_item({
+                    # In lokale Historie aufnehmen (im Hauptthread)
+                    self._post_ui(self.add_history_item, {
                         "filename": data.get("filename") or self.selected_file.name,
                         "download_url": self.last_link,
                         "token": data.get("token"),
                         "expires_at": data.get("expires_at"),
-                        "size": data.get("size"),
+                        "size": data.get("size", st.st_size if st else None),
                         "created_at": datetime.now(timezone.utc).isoformat(),
                         # Neue Zählerspalte; für Alt-Daten weiter kompatibel
                         "download_count": 0,
                         "downloaded": False,
                     })
-                    self.refresh_uploads_list()
+                    self._post_ui(self.refresh_uploads_list)
                 else:
                     self.logln("Fehler beim Upload: Unbekannte Antwort")
             except requests.HTTPError as e:
@@ -468,48 +979,132 @@ class App(tk.Tk):
             except Exception as e:
                 self.logln(f"Fehler: {e}")
             finally:
-                self.upload_btn.config(state=tk.NORMAL)
+                self._post_ui(lambda: self.upload_btn.config(state=tk.NORMAL))
 
         threading.Thread(target=worker, daemon=True).start()
 
     
 
-    def _on_exp_change(self, value):
+    def _on_exp_change(self, _value):
+        # Beim Ziehen feuert der Regler pro Pixel; Label nur einmal pro Idle-Phase aktualisieren
+        if self._exp_pending:
+            return
+        self._exp_pending = True
+        self.after_idle(self._commit_exp)
+
+    def _exp_days(self) -> int:
+        # Eine Umrechnung für Anzeige und Upload: Reglerwert (float) runden
         try:
-            iv = int(float(value))
+            return int(round(float(self.exp_scale.get())))
         except Exception:
-            iv = 7
-        self.exp_value_lbl.config(text=str(iv))
+            return 7
+
+    def _commit_exp(self):
+        self._exp_pending = False
+        text = str(self._exp_days())
+        if str(self.exp_value_lbl.cget("text")) != text:
+            self.exp_value_lbl.config(text=text)
 
     # Upload-Historie (lokal, pro Benutzer)
     def load_history(self) -> list:
         try:
-            if self.history_path.exists():
-                with open(self.history_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, list):
-                    return data
+            # Ein stat statt exists() + stat(); fehlende Datei -> leere Historie
+            try:
+                size = os.stat(self.history_path).st_size
+            except FileNotFoundError:
+                return []
+            if _HAS_IJSON and size > HISTORY_STREAM_THRESHOLD:
+                # Große Historie: Einträge einzeln parsen statt Text + Baum gleichzeitig im Speicher;
+                # orjson gilt nur für kleinere Dateien, wo das komplette Einlesen günstiger ist
+                with open(self.history_path, "rb") as f:
+                    data = [it for it in ijson.items(f, "item", use_float=True) if isinstance(it, dict)]
+            else:
+                data = _json_loads(self.history_path.read_bytes())
+            if isinstance(data, list):
+                # Zähler einmal beim Laden normalisieren, die Anzeige macht dann nur noch str()
+                for it in data:
+                    if isinstance(it, dict):
+                        it["download_count"] = _download_count(it)
+                return data
         except Exception:
             pass
         return []
 
     def save_history(self):
+        # Sofort schreiben (z. B. beim Schließen); sonst _schedule_save verwenden
+        if self._history_save_after_id is not None:
+            try:
+                self.after_cancel(self._history_save_after_id)
+            except Exception:
+                pass
+            self._history_save_after_id = None
+        self._flush_history()
+
+    def _schedule_save(self):
+        # Schreibvorgänge bündeln: mehrere Änderungen innerhalb von 500 ms ergeben ein Schreiben
+        if threading.current_thread() is not threading.main_thread():
+            self._post_ui(self._schedule_save)
+            return
+        self._history_dirty = True
+        if self._history_save_after_id is not None:
+            try:
+                self.after_cancel(self._history_save_after_id)
+            except Exception:
+                pass
+        self._history_save_after_id = self.after(500, self._flush_history)
+
+    def _flush_history(self):
+        self._history_save_after_id = None
+        self._history_dirty = False
+        # Erst in Temp-Datei schreiben, dann atomar ersetzen: ein Absturz beim
+        # Schreiben hinterlässt nie eine halbe history.json. Läuft nur im Tk-Hauptthread
+        # (after-Timer bzw. _on_close), daher ohne Lock.
         try:
-            with open(self.history_path, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False)
+            data = _json_dumps(_persistable(self.history))
+            digest = hashlib.blake2b(data).digest()
+            if digest == self._history_hash:
+                return  # Inhalt unverändert
+            tmp_path = self.history_path.with_name(self.history_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.history_path)
+            self._history_hash = digest
         except Exception as e:
             self.logln(f"Konnte Historie nicht speichern: {e}")
 
+    @property
+    def history(self) -> list:
+        return list(self._history_by_key.values())
+
+    @history.setter
+    def history(self, items: list):
+        by_key = OrderedDict()
+        for it in items:
+            # Bei Duplikaten gewinnt der erste (neueste) Eintrag
+            by_key.setdefault(_history_key(it), it)
+        self._history_by_key = by_key
+        self._exp_heap = [self._exp_entry(k, it) for k, it in by_key.items() if it.get("expires_at")]
+        heapq.heapify(self._exp_heap)
+
+    def _exp_entry(self, key: str, it: dict) -> tuple:
+        # Ungültiges Datum zählt als abgelaufen (wie _is_expired)
+        dt = _parse_iso(it["expires_at"]) or datetime.min.replace(tzinfo=timezone.utc)
+        return (dt, next(self._exp_seq), key, it)
+
     def add_history_item(self, item: dict):
-        # Verhindere Duplikate anhand Token/URL
-        token = item.get("token")
-        url = item.get("download_url")
-        if token:
-            self.history = [it for it in self.history if it.get("token") != token]
-        elif url:
-            self.history = [it for it in self.history if it.get("download_url") != url]
-        self.history.insert(0, item)
-        self.save_history()
+        # Verhindere Duplikate anhand Token/URL: alten Eintrag ersetzen und nach vorne holen
+        key = _history_key(item)
+        self._row_values(item)
+        self._history_by_key.pop(key, None)
+        self._history_by_key[key] = item
+        self._history_by_key.move_to_end(key, last=False)
+        if item.get("expires_at"):
+            heapq.heappush(self._exp_heap, self._exp_entry(key, item))
+        # Neuer Link: wieder im Grundintervall prüfen (bereits geplanten, längeren Timer ersetzen)
+        if self._validate_idle_passes:
+            self._validate_idle_passes = 0
+            self._schedule_validate(VALIDATE_INTERVAL_MS)
+        self._schedule_save()
 
     # Export/Import der Upload-Liste -------------------------------------------------
     def export_history(self):
@@ -524,8 +1119,7 @@ class App(tk.Tk):
             )
             if not path:
                 return
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False)
+            Path(path).write_bytes(_json_dumps(_persistable(self.history)))
             self.logln(f"Uploads exportiert: {path}")
         except Exception as e:
             messagebox.showerror("Fehler", f"Export fehlgeschlagen: {e}")
@@ -538,8 +1132,7 @@ class App(tk.Tk):
             )
             if not path:
                 return
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _json_loads(Path(path).read_bytes())
             if not isinstance(data, list):
                 raise ValueError("JSON muss eine Liste von Objekten sein")
             cleaned = self._normalize_history_items(data)
@@ -554,7 +1147,7 @@ class App(tk.Tk):
                 self.history = cleaned
             else:
                 self.history = self._merge_history(self.history, cleaned)
-            self.save_history()
+            self._schedule_save()
             self.refresh_uploads_list()
             self.logln(f"Uploads importiert: {path} ({len(cleaned)} Einträge)")
         except Exception as e:
@@ -573,7 +1166,9 @@ class App(tk.Tk):
                 "size": it.get("size"),
                 "created_at": it.get("created_at") or datetime.now(timezone.utc).isoformat(),
                 "downloaded": bool(it.get("downloaded", False)),
+                "download_count": _download_count(it),
             }
+            _created_ts(n)
             # Minimal: Es muss mindestens eine URL oder ein Token vorhanden sein
             if not n["download_url"] and not n["token"]:
                 # überspringen statt failen: toleranter Import
@@ -583,92 +1178,132 @@ class App(tk.Tk):
 
     def _merge_history(self, existing: list, incoming: list) -> list:
         # Duplikate anhand token bevorzugt, sonst download_url
-        out = []
-        seen = set()
         def key_for(it):
             return (it.get("token") or "") + "|" + (it.get("download_url") or "")
 
-        # incoming zuerst (neuer gewinnt), dann existing
-        for src in (incoming, existing):
-            for it in src:
-                k = key_for(it)
-                if k in seen:
-                    continue
-                seen.add(k)
-                out.append(it)
+        # Nach created_at absteigend; Schlüssel ist ein gecachter float statt erneutem Datums-Parsen
+        def sort_key(it):
+            return -_created_ts(it)
 
-        # optional: nach created_at absteigend sortieren, fallback: unsortiert
-        def parse_dt(s):
-            try:
-                if isinstance(s, str):
-                    t = s.strip()
-                    if t.endswith("Z"):
-                        t = t[:-1] + "+00:00"
-                    return datetime.fromisoformat(t)
-            except Exception:
-                pass
-            return datetime.min.replace(tzinfo=timezone.utc)
+        def ordered(items):
+            keys = [sort_key(it) for it in items]
+            if all(a <= b for a, b in zip(keys, keys[1:])):
+                return items  # Historie ist normalerweise schon sortiert
+            return sorted(items, key=sort_key)
 
-        out.sort(key=lambda it: parse_dt(it.get("created_at")), reverse=True)
-        return out
+        # incoming gewinnt bei Duplikaten (neuer), dann existing
+        inc = []
+        seen = set()
+        for it in incoming:
+            k = key_for(it)
+            if k not in seen:
+                seen.add(k)
+                inc.append(it)
+        ex = []
+        for it in existing:
+            k = key_for(it)
+            if k not in seen:
+                seen.add(k)
+                ex.append(it)
+        # Zwei sortierte Listen in O(N) zusammenführen
+        return list(heapq.merge(ordered(inc), ordered(ex), key=sort_key))
 
-    def _is_expired(self, expires_at: str | None) -> bool:
+    def _is_expired(self, expires_at: str | None, now: datetime | None = None) -> bool:
         if not expires_at:
             return False
-        try:
-            # Support timestamps with trailing 'Z' and without timezone
-            ts = expires_at.strip()
-            if ts.endswith("Z"):
-                ts = ts[:-1] + "+00:00"
-            dt = datetime.fromisoformat(ts)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-        except Exception:
+        dt = _parse_iso(expires_at)
+        if dt is None:
             # Falls ungültig, als abgelaufen behandeln
             return True
-        return datetime.now(timezone.utc) > dt
+        return (now or datetime.now(timezone.utc)) > dt
 
     def refresh_uploads_list(self):
         # Entferne abgelaufene aus Ansicht (optional: gleichzeitig aus Datei entfernen)
-        pruned = []
-        for it in self.history:
-            if not self._is_expired(it.get("expires_at")):
-                pruned.append(it)
-        if len(pruned) != len(self.history):
-            self.history = pruned
-            self.save_history()
+        # Nur die tatsächlich abgelaufenen Einträge vom Heap nehmen statt alle zu prüfen
+        now = datetime.now(timezone.utc)
+        heap = self._exp_heap
+        expired = False
+        while heap and heap[0][0] < now:
+            _dt, _seq, key, it = heapq.heappop(heap)
+            # Eintrag inzwischen entfernt/ersetzt -> Heap-Eintrag ist veraltet
+            if self._history_by_key.get(key) is it:
+                del self._history_by_key[key]
+                expired = True
+        if expired:
+            self._schedule_save()
+
+        # Liste abgleichen statt neu füllen: nur neue/geänderte/entfernte Zeilen anfassen
+        tree = self.uploads_tree
+        rows = {}
+        for key, it in self._history_by_key.items():
+            name, exp, count, url = it.get("_row") or self._row_values(it)
+            rows[key] = ((name, exp, count), url)
+        stale = [iid for key, iid in self._iid_by_key.items() if key not in rows]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                self.row_url.pop(iid, None)
+                self.row_key.pop(iid, None)
+                self._values_by_iid.pop(iid, None)
+        # Direkt über tk.call statt Treeview.insert/item: spart das kwargs-Packing pro Zeile
+        call = self.tk.call
+        w = str(tree)
+        new_iids = {}
+        order = []
+        for idx, (key, (values, url)) in enumerate(rows.items()):
+            iid = self._iid_by_key.get(key)
+            if iid is None:
+                # Direkt an der Zielposition einfügen, damit keine Verschiebungen nötig sind
+                iid = call(w, "insert", "", idx, "-values", values)
+            elif self._values_by_iid.get(iid) != values:
+                call(w, "item", iid, "-values", values)
+            self._values_by_iid[iid] = values
+            # URL pro Zeile merken (nicht sichtbar)
+            self.row_url[iid] = url
+            self.row_key[iid] = key
+            new_iids[key] = iid
+            order.append(iid)
+        # Nur wenn sich die Reihenfolge bestehender Zeilen geändert hat (z.B. Import)
+        if list(tree.get_children()) != order:
+            for idx, iid in enumerate(order):
+                tree.move(iid, "", idx)
+        self._iid_by_key = new_iids
+        self._update_sel_buttons()
+        self._schedule_expiry_check()
 
-        # Liste neu füllen
-        self.row_url.clear()
-        for row in self.uploads_tree.get_children():
-            self.uploads_tree.delete(row)
-        for it in self.history:
-            name = it.get("filename") or "(unbekannt)"
-            exp = it.get("expires_at") or "nie/one-time"
-            # Anzeige: Zähler statt Ja/Nein; fallback für Alt-Historie
-            count = it.get("download_count")
-            if isinstance(count, bool):
-                count = 1 if count else 0
-            if count is None:
-                count = 1 if it.get("downloaded") else 0
+    def _schedule_expiry_check(self):
+        # Statt periodisch alles zu prüfen: genau zum nächsten Ablauf erneut aktualisieren
+        if self._expiry_after_id is not None:
             try:
-                count = int(count)
+                self.after_cancel(self._expiry_after_id)
             except Exception:
-                count = 0
-            url = it.get("download_url") or ""
-            iid = self.uploads_tree.insert("", tk.END, values=(name, exp, str(count)))
-            # URL pro Zeile merken (nicht sichtbar)
-            self.row_url[str(iid)] = url
-        self._update_sel_buttons()
+                pass
+            self._expiry_after_id = None
+        if not self._exp_heap:
+            return
+        delay = (self._exp_heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+        # Obergrenze, damit lange Ablaufzeiten Tk nicht überlaufen (und Uhrzeitsprünge abgefangen werden)
+        delay_ms = int(min(max(delay, 0) + 1, 3600) * 1000)
+        self._expiry_after_id = self.after(delay_ms, self._on_expiry_due)
+
+    def _on_expiry_due(self):
+        self._expiry_after_id = None
+        self.refresh_uploads_list()
+
+    def _row_values(self, it: dict) -> tuple:
+        """Anzeigewerte (name, expires, downloads, url) einmal berechnen und am Eintrag cachen.
+        Bei Änderung von Zähler/Ablauf muss '_row' entfernt werden.
+        """
+        name = it.get("filename") or "(unbekannt)"
+        exp = it.get("expires_at") or "nie/one-time"
+        # Anzeige: Zähler statt Ja/Nein (beim Laden/Import bereits als int normalisiert)
+        row = (name, exp, str(it.get("download_count", 0)), it.get("download_url") or "")
+        it["_row"] = row
+        return row
 
     def refresh_uploads_click(self):
-        # Run a quick network validation in background, then refresh UI
-        def worker():
-            try:
-                self._network_prune_once()
-            finally:
-                self.after(0, self.refresh_uploads_list)
-        threading.Thread(target=worker, daemon=True).start()
+        # Manuell angestoßen: Zähler frisch abfragen, Cache ignorieren; Liste wird danach aktualisiert
+        self._network_prune_once(max_age=0)
 
     def _get_selected_values(self):
         sel = self.uploads_tree.selection()
@@ -709,119 +1344,302 @@ class App(tk.Tk):
         if url:
             webbrowser.open(url)
             # Nach kurzer Zeit prüfen, ob Link ungültig wurde (z.B. One-Time)
-            def worker():
-                time.sleep(3)
-                try:
-                    self._network_prune_once()
-                finally:
-                    self.after(0, self.refresh_uploads_list)
-            threading.Thread(target=worker, daemon=True).start()
+            self._last_ok.pop(url, None)
+            self.after(3000, self._network_prune_once)
 
     def remove_selected(self):
         vals = self._get_selected_values()
         if not vals:
             return
         name, _exp, url = vals
-        # Entferne aus history per URL
-        self.history = [it for it in self.history if it.get("download_url") != url]
-        self.save_history()
+        # Entferne aus history per Schlüssel der Zeile
+        key = self.row_key.get(str(self.uploads_tree.selection()[0]))
+        if key is not None:
+            self._history_by_key.pop(key, None)
+        self._schedule_save()
         self.refresh_uploads_list()
         self.logln(f"Aus Liste entfernt: {name}")
 
     # Hintergrundvalidierung: entferne Links, die 404/410 zurückgeben
-    def _network_prune_once(self):
-        to_remove_urls = set()
-        for it in list(self.history):
+    def _network_prune_once(self, max_age: float = 300, auto: bool = False) -> bool:
+        """Startet eine Prüfung aller Links (im Tk-Hauptthread aufrufen).
+        Links, die vor weniger als max_age Sekunden ok waren, werden übersprungen.
+        Die Netzwerkabfragen laufen im Validierungs-Thread, die Ergebnisse werden
+        wieder im Hauptthread angewendet – self.history wird nur dort verändert.
+        Bei auto=True plant _apply_link_results den nächsten periodischen Durchlauf.
+        Rückgabe: True, wenn eine Prüfung gestartet wurde.
+        """
+        now = time.monotonic()
+        now_utc = datetime.now(timezone.utc)
+        items = []
+        for it in self.history:
             url = it.get("download_url")
             if not url:
                 continue
             # Wenn bereits per Zeit abgelaufen, wird es woanders entfernt
-            if self._is_expired(it.get("expires_at")):
+            if self._is_expired(it.get("expires_at"), now_utc):
                 continue
-            try:
-                # 1) HEAD versuchen
-                resp = requests.head(url, allow_redirects=True, timeout=5)
-                if resp.status_code in (404, 410):
-                    to_remove_urls.add(url)
-                    continue
-                # 2) Falls HEAD nichts sagt (z.B. 200), zusätzlich API-Status prüfen
-                token = it.get("token")
-                if token:
-                    api_base = self.settings.get("api_url", "http://127.0.0.1:8000").rstrip("/")
-                    status_url = f"{api_base}/api/link-status/{token}"
-                    sresp = requests.get(status_url, timeout=5)
-                    if sresp.ok:
-                        data = sresp.json()
-                        if not data.get("exists", True):
-                            to_remove_urls.add(url)
-                            continue
-                        # Update download counter and legacy 'downloaded' flag
-                        new_count = data.get("download_count")
-                        try:
-                            new_count = int(new_count) if new_count is not None else None
-                        except Exception:
-                            new_count = None
-                        if new_count is not None:
-                            if it.get("download_count") != new_count:
-                                it["download_count"] = new_count
-                                # Maintain legacy boolean for compatibility
-                                if new_count > 0:
-                                    it["downloaded"] = True
-                                self.save_history()
-            except requests.RequestException:
-                # Netzwerkfehler ignorieren (später erneut versuchen)
-                pass
+            if now - self._last_ok.get(url, float("-inf")) < max_age:
+                continue
+            items.append(it)
+        if not items:
+            self.refresh_uploads_list()
+            return False
+
+        api_base = self._api_base
+        try:
+            self._validator.submit(self._check_links, items, api_base, auto)
+        except RuntimeError:
+            return False  # Pool bereits heruntergefahren (Fenster wird geschlossen)
+        return True
+
+    def _check_links(self, items: list, api_base: str, auto: bool = False):
+        # Läuft im Validierungs-Thread: nur Netzwerk, keine Änderungen an self.history
+        if self._stop_event.is_set():
+            return
+        results = {}
+        try:
+            # 1) Alle Tokens in einem Aufruf prüfen (ein Round-Trip statt 2 pro Link)
+            token_items = [(it, tok) for it in items if (tok := self._link_token(it, api_base))]
+            statuses = self._fetch_link_statuses(api_base, [tok for _it, tok in token_items]) if token_items else None
+            if statuses is not None:
+                for it, tok in token_items:
+                    results[id(it)] = self._result_from_status(it["download_url"], statuses.get(tok))
+            # 2) Rest (ohne Token oder Backend ohne Batch-Endpoint) einzeln, parallel;
+            #    bei nicht erreichbarem Backend bleiben die Token-Einträge ohne Ergebnis (alive=None)
+            rest = [it for it in items if id(it) not in results]
+            if rest:
+                # I/O-gebunden: Prüfungen parallel (Pool bleibt über Durchläufe bestehen), Ergebnisse danach gesammelt anwenden
+                for it, res in zip(rest, self._link_pool.map(lambda it: self._check_one_link(it, api_base), rest)):
+                    results[id(it)] = res
+        except Exception:
+            # Unerwarteter Fehler: Durchlauf trotzdem abschließen, damit der Timer weiterläuft
+            pass
+        self._post_ui(self._apply_link_results, items, results, auto)
+
+    def _apply_link_results(self, items: list, results: dict, auto: bool = False):
+        # Tk-Hauptthread: Ergebnisse übernehmen, einmal speichern, Liste aktualisieren
+        to_remove_urls = set()
+        changed = False
+        for it in items:
+            key = _history_key(it)
+            # Eintrag wurde während der Prüfung entfernt oder ersetzt (oder ohne Ergebnis)
+            if self._history_by_key.get(key) is not it or id(it) not in results:
+                continue
+            url, alive, new_count = results[id(it)]
+            if alive is False:
+                to_remove_urls.add(url)
+                del self._history_by_key[key]
+                continue
+            if alive:
+                self._last_ok[url] = time.monotonic()
+            # Update download counter and legacy 'downloaded' flag
+            if new_count is not None and it.get("download_count") != new_count:
+                it["download_count"] = new_count
+                it.pop("_row", None)
+                # Maintain legacy boolean for compatibility
+                if new_count > 0:
+                    it["downloaded"] = True
+                changed = True
 
         if to_remove_urls:
-            self.history = [h for h in self.history if h.get("download_url") not in to_remove_urls]
-            self.save_history()
+            for url in to_remove_urls:
+                self._last_ok.pop(url, None)
             self.logln(f"{len(to_remove_urls)} ungültige Links aus der Liste entfernt")
+        if changed or to_remove_urls:
+            self._schedule_save()
+            self._validate_idle_passes = 0
+        else:
+            self._validate_idle_passes += 1
+        if auto:
+            # Nächsten Durchlauf erst jetzt planen, mit dem Ergebnis dieses Durchlaufs
+            self._schedule_validate(self._validate_interval())
+        self.refresh_uploads_list()
 
-    def _auto_validate_loop(self, interval_seconds: int = 600):
-        # Initial kleine Verzögerung, dann periodisch prüfen
-        time.sleep(3)
-        while not self._stop_event.is_set():
+    def _fetch_link_statuses(self, api_base: str, tokens: list) -> dict | None:
+        """Batch-Abfrage POST /api/link-status.
+        None nur, wenn das Backend den Endpoint nicht kennt (404/405) -> Einzelprüfung.
+        Ist das Backend nicht erreichbar oder antwortet fehlerhaft, kommt {} zurück:
+        kein Ergebnis für diesen Durchlauf, statt jeden Link einzeln gegen denselben Host zu prüfen.
+        """
+        import requests
+
+        # Gleiche Token-Liste wie beim letzten Mal: bedingt anfragen, 304 = unverändert
+        key = tuple(tokens)
+        cached = self._batch_cache if self._batch_cache and self._batch_cache[0] == key else None
+        headers = {"If-None-Match": cached[1]} if cached else {}
+        try:
+            resp = self._http().post(f"{api_base}/api/link-status", json={"tokens": tokens}, headers=headers, timeout=10)
+            if resp.status_code == 304 and cached:
+                return cached[2]
+            if resp.status_code in (404, 405):
+                return None  # Älteres Backend ohne Batch-Endpoint
+            if not resp.ok:
+                return {}
+            statuses = resp.json().get("statuses")
+            if not isinstance(statuses, dict):
+                return {}
+            etag = resp.headers.get("ETag")
+            self._batch_cache = (key, etag, statuses) if etag else None
+            return statuses
+        except (requests.RequestException, ValueError, AttributeError):
+            return {}
+
+    @staticmethod
+    def _link_token(it: dict, api_base: str) -> str | None:
+        """Token eines Eintrags; Alt-Einträge ohne Token, deren URL auf dieses Backend zeigt
+        ({api_base}/d/<token>), werden ebenfalls in die Batch-Abfrage aufgenommen.
+        """
+        token = it.get("token")
+        if token:
+            return token
+        prefix = api_base + "/d/"
+        url = it.get("download_url") or ""
+        if url.startswith(prefix):
+            token = url[len(prefix):].split("?", 1)[0].split("#", 1)[0]
+            if token and "/" not in token:
+                return token
+        return None
+
+    @staticmethod
+    def _result_from_status(url: str, status) -> tuple:
+        """Link-Status-Antwort in (url, alive, download_count) übersetzen."""
+        if not isinstance(status, dict):
+            return url, None, None
+        if not status.get("exists", True):
+            return url, False, None
+        new_count = status.get("download_count")
+        try:
+            new_count = int(new_count) if new_count is not None else None
+        except Exception:
+            new_count = None
+        return url, True, new_count
+
+    def _check_one_link(self, it: dict, api_base: str) -> tuple:
+        """Prüft einen Link. Rückgabe: (url, alive, download_count).
+        alive ist False bei 404/410 bzw. exists=False, None wenn unklar (Netzwerkfehler).
+        """
+        import requests
+
+        http = self._http()
+        url = it.get("download_url")
+        try:
+            # 1) HEAD versuchen (Redirects nicht folgen: 3xx zählt als vorhanden)
+            resp = http.head(url, allow_redirects=False, timeout=3)
+            if resp.status_code in (404, 410):
+                return url, False, None
+            # 2) Falls HEAD nichts sagt (z.B. 200), zusätzlich API-Status prüfen
+            token = it.get("token")
+            if not token:
+                return url, True, None
+            etag = self._status_etags.get(url)
+            headers = {"If-None-Match": etag} if etag else {}
+            sresp = http.get(f"{api_base}/api/link-status/{token}", headers=headers, timeout=5)
+            if sresp.status_code == 304:
+                # Status unverändert seit der letzten Prüfung
+                return url, True, None
+            if not sresp.ok:
+                return url, None, None
+            if sresp.headers.get("ETag"):
+                self._status_etags[url] = sresp.headers["ETag"]
+            return self._result_from_status(url, sresp.json())
+        except (requests.RequestException, ValueError):
+            # Netzwerkfehler ignorieren (später erneut versuchen)
+            return url, None, None
+
+    def _auto_validate_tick(self):
+        # Periodische Prüfung über den Tk-Timer statt eines eigenen Schlaf-Threads
+        self._validate_after_id = None
+        if self._stop_event.is_set():
+            return
+        try:
+            if self._network_prune_once(auto=True):
+                return  # _apply_link_results plant den nächsten Durchlauf
+        except Exception:
+            pass
+        self._schedule_validate(self._validate_interval())
+
+    def _validate_interval(self) -> int:
+        # Back-off: solange sich nichts ändert, seltener prüfen
+        return min(VALIDATE_INTERVAL_MS << min(self._validate_idle_passes, 8), VALIDATE_INTERVAL_MAX_MS)
+
+    def _schedule_validate(self, delay_ms: int):
+        # Höchstens ein geplanter Durchlauf: vorhandenen Timer ersetzen
+        if self._stop_event.is_set():
+            return
+        if self._validate_after_id is not None:
             try:
-                self._network_prune_once()
-                # UI aktualisieren im Hauptthread
-                self.after(0, self.refresh_uploads_list)
+                self.after_cancel(self._validate_after_id)
             except Exception:
                 pass
-            # Warte mit Abbruchprüfung
-            for _ in range(interval_seconds):
-                if self._stop_event.is_set():
-                    break
-                time.sleep(1)
+        self._validate_after_id = self.after(delay_ms, self._auto_validate_tick)
 
     def _start_background_validation(self):
-        t = threading.Thread(target=self._auto_validate_loop, args=(600,), daemon=True)
-        t.start()
+        # Ein einziger Validierungs-Thread; Prüfungen laufen nacheinander statt sich zu überholen.
+        # Daemon-Threads: ein hängender Request hält den Prozess beim Schließen nicht am Leben
+        self._validator = _DaemonPool(1, "dateilink-validate")
+        # Begrenzter Pool für einzelne Link-Prüfungen; Threads werden erst bei Bedarf gestartet
+        self._link_pool = _DaemonPool(PRUNE_WORKERS, "dateilink-check")
+        # ETags für bedingte Status-Abfragen (nur von den Prüf-Threads benutzt, nicht persistiert)
+        self._status_etags: dict[str, str] = {}
+        self._batch_cache = None  # (Token-Tupel, ETag, statuses) der letzten Batch-Abfrage
+        # Aufeinanderfolgende Prüfungen ohne Änderung (für das Back-off des Intervalls)
+        self._validate_idle_passes = 0
+        # Initial kleine Verzögerung, dann periodisch prüfen
+        self._validate_after_id = self.after(3000, self._auto_validate_tick)
 
     def _on_close(self):
         # Signalisiere Hintergrundthread zum Beenden, dann Fenster schließen
         try:
             self._stop_event.set()
+            if self._validate_after_id is not None:
+                self.after_cancel(self._validate_after_id)
+            self._validator.shutdown()
+            self._link_pool.shutdown()
         except Exception:
             pass
+        if self._session is not None:
+            try:
+                self._session.close()
+            except Exception:
+                pass
+        # Noch ausstehende Schreibvorgänge nicht verlieren. Nicht blockierend warten: ein
+        # Fehler-Log des Writers geht über _post_ui und braucht den Hauptthread
+        if self._settings_writer is not None:
+            self._settings_writer.shutdown(wait=False)
+            while self._settings_future is not None and not self._settings_future.done():
+                self.update()
+                time.sleep(0.01)
+        if self._history_dirty:
+            self.save_history()
         self.destroy()
 
     # Settings management
     def load_settings(self) -> dict:
         # host/port entfernt – nur noch komplette API URL nötig
-        defaults = {"api_url": "http://127.0.0.1:8000", "upload_token": ""}
+        defaults = {"api_url": DEFAULT_API_URL, "upload_token": ""}
         try:
-            if self.config_path.exists():
-                with open(self.config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                return {**defaults, **data}
+            # Direkt lesen; fehlt die Datei, greifen die Defaults
+            data = _json_loads(self.config_path.read_bytes())
+            return {**defaults, **data}
         except Exception:
             pass
         return defaults
 
     def save_settings(self):
+        # Datei-I/O nicht im Tk-Hauptthread; ein einzelner Worker hält die Reihenfolge der Schreibvorgänge
+        if self._settings_writer is None:
+            self._settings_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dateilink-settings")
+        self._settings_future = self._settings_writer.submit(self._write_settings, dict(self.settings))
+
+    def _write_settings(self, settings: dict):
+        # Wie bei der Historie: einmal komplett serialisieren, Temp-Datei schreiben, atomar ersetzen
         try:
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
+            data = _json_dumps(settings)
+            tmp_path = self.config_path.with_name(self.config_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.config_path)
         except Exception as e:
             self.logln(f"Konnte Einstellungen nicht speichern: {e}")
 
@@ -861,19 +1679,28 @@ class App(tk.Tk):
                 pass
 
     def _apply_settings(self, new_settings: dict):
-        url = (new_settings.get("api_url") or "http://127.0.0.1:8000").strip()
+        url = (new_settings.get("api_url") or DEFAULT_API_URL).strip()
         upload_token = new_settings.get("upload_token", "").strip()
         self.settings = {"api_url": url, "upload_token": upload_token}
+        api_base, valid = _api_base_from(url)
+        if api_base != self._api_base:
+            # Anderer Server: Status-Caches gelten nicht mehr (Session/Verbindungspool bleibt bestehen)
+            self._api_base = api_base
+            self._last_ok.clear()
+            self._batch_cache = None
+            self._status_etags.clear()
         self.save_settings()
         masked = (upload_token[:4] + "***") if upload_token else "(kein Token)"
         self.logln(f"Einstellungen gespeichert. API: {url} | Token: {masked}")
+        if not valid:
+            self.logln("Warnung: API-URL sollte mit http:// oder https:// beginnen und einen Host enthalten.")
 
     def _build_settings_tab(self, parent: ttk.Frame, on_close=None, on_cancel=None):
         pad = {"padx": 10, "pady": 6}
         frm = ttk.Frame(parent, style="Card.TFrame")
         frm.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
         ttk.Label(frm, text="Backend API URL").grid(row=0, column=0, sticky="w", **pad)
-        api_var = tk.StringVar(value=self.settings.get("api_url", "http://127.0.0.1:8000"))
+        api_var = tk.StringVar(value=self.settings.get("api_url", DEFAULT_API_URL))
         api_entry = ttk.Entry(frm, textvariable=api_var, width=50)
         api_entry.grid(row=0, column=1, sticky="ew", **pad)
         ttk.Label(frm, text="Upload Token").grid(row=1, column=0, sticky="w", **pad)
@@ -45,14 +45,6 @@ if ($python -eq 'python') {
     Write-Host "Virtualenv Python not found, using system python." -ForegroundColor Yellow
 }
 
-# Ensure pip is available
-try {
-    & $python -m pip --version | Out-Null
-} catch {
-    Write-Host "Bootstrapping pip (ensurepip)…" -ForegroundColor Yellow
-    & $python -m ensurepip --upgrade
-}
-
 # Install dependencies if uvicorn is missing
 $needInstall = $false
 try {
@@ -61,6 +53,13 @@ try {
     $needInstall = $true
 }
 if ($needInstall) {
+    # Ensure pip is available (only needed for installing; saves an extra Python start otherwise)
+    try {
+        & $python -m pip --version | Out-Null
+    } catch {
+        Write-Host "Bootstrapping pip (ensurepip)…" -ForegroundColor Yellow
+        & $python -m ensurepip --upgrade
+    }
     Write-Host "Installing requirements…" -ForegroundColor Cyan
     & $python -m pip install --upgrade pip
     & $python -m pip install -r (Join-Path $root "requirements.txt")